@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+# (c) 2024, Peter Magnusson <me@kmpm.se>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import abc
+
+from ansible.module_utils.six import add_metaclass
+from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import (
+    IncusClientException, get_client, incus_to_module_state, is_subset, map_in_batches,
+    predict_response)
+
+
+@add_metaclass(abc.ABCMeta)
+class BaseIncusResource(object):
+    """Drive a single Incus API resource to the state given by the module options.
+    Subclasses set the attributes below and must implement _build_payload().
+    """
+    # Key of the resource metadata in the diff and the result.
+    RESOURCE_KEY = None
+    # The option that names the resource, e.g. listen_address for a network forward.
+    NAME_PARAM = 'name'
+    # URL templates of the collection and of the resource, formatted with the instance.
+    RESOURCE_URL_LIST = None
+    RESOURCE_URL_SINGLE = None
+    # The fields set by the module, the only ones compared for changes.
+    MANAGED_FIELDS = ()
+    # Returned by the state handlers when the resource was left untouched.
+    NOOP = object()
+
+    def __init__(self, module, item_params=None, client=None, **kwargs):
+        self.module = module
+        params = item_params or self.module.params
+
+        self.name = params[self.NAME_PARAM]
+        self.description = params['description']
+        self.config = params['config']
+        self.project = params['project']
+        self.state = params['state']
+        self._set_params(params)
+        self.actions = []
+
+        self._base_url = self.RESOURCE_URL_LIST.format(self=self)
+        self._resource_url = self.RESOURCE_URL_SINGLE.format(self=self)
+
+        self.debug = self.module._verbosity >= 3
+
+        if client is None:
+            try:
+                client = get_client(self.project, self.debug)
+            except IncusClientException as e:
+                self.module.fail_json(msg=e.msg)
+        self.client = client
+
+        self.diff = {'before': {}, 'after': {}}
+
+        # A map of desired state -> handler method.
+        self._dispatch = {
+            'present': self._present,
+            'absent': self._absent,
+        }
+
+    def _set_params(self, params):
+        """Set the options specific to the resource type."""
+
+    def _get_resource(self):
+        return self.client.query_raw('GET', self._resource_url, ok_errors=[404])
+
+    @abc.abstractmethod
+    def _build_payload(self):
+        """Build the body of the create and update requests from the module options.
+        Returns the payload as a dict.
+        """
+
+    def _validate(self):
+        """Check the options for combinations the server would refuse.
+        Returns an error message, or None if the options are valid.
+        """
+        return None
+
+    def _converged(self):
+        """Check if the resource already is in the desired state."""
+        if self.diff['before']['state'] != self.state:
+            return False
+        return self.state == 'absent' or is_subset(self._build_payload(), self.diff['before'][self.RESOURCE_KEY])
+
+    # Drive the state of the resource to match the specified state, creating or
+    # updating it as necessary.
+    def _present(self):
+        method = 'POST'
+
+        if self.diff['before']['state'] == "present":
+            if self._converged():
+                # Nothing to update, skip the request altogether.
+                self.actions.append('noop')
+                return self.NOOP
+            method = 'PATCH'
+
+        payload = self._build_payload()
+
+        # Creation goes to the collection, updates to the resource itself.
+        url = self._base_url if method == 'POST' else self._resource_url
+
+        if not self.module.check_mode:
+            res = self.client.query_raw(method, url, payload=payload)
+        else:
+            # Nothing was sent, work out the new state locally.
+            res = predict_response(self.diff['before'][self.RESOURCE_KEY], payload)
+
+        self.actions.append('create' if method == 'POST' else 'update')
+        return res
+
+    # Ensure the resource does not exist.
+    def _absent(self):
+        if self.diff['before']['state'] == "absent":
+            self.actions.append('noop')
+            return self.NOOP
+        self.actions.append('delete')
+        if not self.module.check_mode:
+            self.client.query_raw('DELETE', self._resource_url)
+        # Once deleted there is nothing left to fetch.
+        return predict_response()
+
+    def _apply(self, current=None):
+        """Drive the resource to the desired state.
+        Takes the current server state if it was already looked up.
+        Returns the result as a dict.
+        """
+        key = self.RESOURCE_KEY
+        if current is None:
+            current = self._get_resource()
+
+        # Set the before / after states for the diff output.
+        self.diff['before'][key] = current['metadata']
+        self.diff['before']['state'] = incus_to_module_state(current)
+
+        # Map the current state to an action.
+        response = self._dispatch[self.state]()
+
+        # An untouched resource keeps its before state, no need to ask again.
+        if response is not self.NOOP:
+            if response and (response.get('metadata') or response.get('error_code') == 404):
+                # The response already describes the new state.
+                current = response
+            else:
+                # Refresh the server state after the action was completed.
+                current = self._get_resource()
+        self.diff['after'][key] = current['metadata']
+        self.diff['after']['state'] = incus_to_module_state(current)
+
+        if self.diff['before']['state'] != self.diff['after']['state']:
+            state_changed = True
+        else:
+            # Fields the server fills in, like used_by, do not count as a change.
+            before = self.diff['before'][key] or {}
+            after = self.diff['after'][key] or {}
+            state_changed = any(before.get(k) != after.get(k) for k in self.MANAGED_FIELDS)
+        result_json = {
+            'changed': state_changed,
+            'old_state': self.diff['before']['state'],
+            key: self.diff['after'][key],
+        }
+        # The full before / after metadata is only returned in diff mode.
+        if self.module._diff:
+            result_json['diff'] = self.diff
+        return result_json
+
+    def run(self):
+        # Refuse invalid options before asking the server anything.
+        error = self._validate()
+        if error:
+            self.module.fail_json(msg=error, changed=False)
+
+        try:
+            result_json = self._apply()
+            result_json['log_verbosity'] = self.module._verbosity
+            if self.debug:
+                result_json['logs'] = self.client.logs
+
+            self.module.exit_json(**result_json)
+
+        except IncusClientException as e:
+            fail_params = {
+                'msg': e.msg,
+                'changed': False,
+            }
+            if self.module._diff:
+                fail_params['diff'] = self.diff
+            if self.client.debug:
+                fail_params['logs'] = self.client.logs
+            self.module.fail_json(**fail_params)
+
+
+def prefetch(client, managers):
+    """Look up the current state of several resources with one list query per collection.
+    Returns a response per manager, in the same order, with None for those whose
+    collection could not be listed.
+    """
+    urls = []
+    for manager in managers:
+        if manager._base_url not in urls:
+            urls.append(manager._base_url)
+    responses = client.query_many([
+        dict(method='GET', url=url, url_params={'recursion': '1'}, ok_errors=[404]) for url in urls])
+
+    listed = {}
+    for url, response in zip(urls, responses):
+        # A missing parent, e.g. the network of a peer, is reported by the item itself.
+        if response.get('type') != 'error':
+            listed[url] = dict((meta['name'], meta) for meta in response['metadata'] or [])
+
+    currents = []
+    for manager in managers:
+        if manager._base_url not in listed:
+            currents.append(None)
+        elif manager.name in listed[manager._base_url]:
+            metadata = listed[manager._base_url][manager.name]
+            currents.append({'type': 'sync', 'status_code': 200, 'error_code': 0, 'metadata': metadata})
+        else:
+            currents.append(predict_response())
+    return currents
+
+
+def lookup_each(client, managers):
+    """Look up the current state of several resources, one concurrent GET per resource.
+    Returns a response per manager, in the same order.
+    """
+    return client.query_many([
+        dict(method='GET', url=manager._resource_url, ok_errors=[404]) for manager in managers])
+
+
+def run_managers(module, managers, lookup=lookup_each, key='name', concurrency=1, batch_size=100, batch_delay=0):
+    """Drive several resource managers that share one client, then exit the module.
+    lookup returns the current server state of every manager, or None for a manager
+    that looks it up itself. Managers whose _validate() returns an error are skipped
+    and reported, the others are still applied. key is the manager attribute that
+    names an item in the results.
+    """
+    client = managers[0].client
+
+    valid, invalid = [], []
+    for manager in managers:
+        validate = getattr(manager, '_validate', None)
+        error = validate() if validate else None
+        if error:
+            invalid.append({key: getattr(manager, key), 'changed': False, 'failed': True, 'msg': error})
+        else:
+            valid.append(manager)
+
+    # Results of the items done so far, reported if one of them fails.
+    done = []
+
+    def apply(item):
+        manager, current = item
+        result = manager._apply(current)
+        result[key] = getattr(manager, key)
+        done.append(result)
+        return result
+
+    try:
+        currents = lookup(client, valid) if valid else []
+        results = map_in_batches(apply, list(zip(valid, currents)), concurrency=concurrency,
+                                 batch_size=batch_size, batch_delay=batch_delay)
+
+    except IncusClientException as e:
+        fail_params = {
+            'msg': e.msg,
+            'changed': any(result['changed'] for result in done),
+            'results': done + invalid,
+        }
+        if client.debug:
+            fail_params['logs'] = client.logs
+        module.fail_json(**fail_params)
+
+    result_json = {
+        'log_verbosity': module._verbosity,
+        'changed': any(result['changed'] for result in results),
+        'results': results + invalid,
+    }
+    if module._diff:
+        result_json['diff'] = [result['diff'] for result in results]
+    if client.debug:
+        result_json['logs'] = client.logs
+    if invalid:
+        result_json['msg'] = '; '.join(item['msg'] for item in invalid)
+        module.fail_json(**result_json)
+    module.exit_json(**result_json)
+
+
+def run_batch(module, items, resource_class):
+    """Manage several resources of resource_class with a single client.
+    Invalid items are skipped and reported, the others are still applied.
+    """
+    for option in ('concurrency', 'batch_size'):
+        if module.params[option] < 1:
+            module.fail_json(msg='{0} must be at least 1, got {1}'.format(option, module.params[option]))
+    if module.params['batch_delay'] < 0:
+        module.fail_json(msg='batch_delay must not be negative, got {0}'.format(module.params['batch_delay']))
+
+    managers = []
+    for item in items:
+        # Options left out of an item are taken from the module options.
+        item_params = dict(module.params)
+        item_params.update((k, v) for k, v in item.items() if v is not None)
+        client = managers[0].client if managers else None
+        managers.append(resource_class(module=module, item_params=item_params, client=client))
+
+    run_managers(module, managers, lookup=prefetch,
+                 concurrency=module.params['concurrency'],
+                 batch_size=module.params['batch_size'],
+                 batch_delay=module.params['batch_delay'])
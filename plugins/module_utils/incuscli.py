@@ -7,12 +7,26 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import copy
+import functools
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from subprocess import Popen, PIPE
 from ansible.module_utils.common.process import get_bin_path
 from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.six.moves.urllib.parse import urlencode
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Most incus processes IncusClient.query_many runs at the same time.
+QUERY_CONCURRENCY = 10
+
 
 class IncusClientException(Exception):
     def __init__(self, msg, **kwargs):
@@ -23,6 +37,116 @@ class IncusClientException(Exception):
         return '{0} {1}'.format(self.msg, self.kwargs)
 
 
+def json_dumps(data):
+    """Serialize data to a JSON string, using orjson when it is available."""
+    if HAS_ORJSON:
+        return to_text(orjson.dumps(data))
+    return json.dumps(data)
+
+
+def json_loads(data):
+    """Deserialize a JSON string, using orjson when it is available."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def incus_to_module_state(resp_json):
+    """Map an Incus API response to the state of the queried resource.
+    Returns 'present' or 'absent'.
+    """
+    return _module_state(resp_json['status_code'], resp_json['error_code'])
+
+
+@functools.lru_cache(maxsize=8)
+def _module_state(status_code, error_code):
+    if status_code == 200:
+        return 'present'
+    if error_code == 404:
+        return 'absent'
+    raise Exception("unknown resource state")
+
+
+def is_subset(desired, current):
+    """Check if current already holds every value set in desired.
+    Keys set to None in desired are ignored and dicts are compared recursively,
+    so entries that are not managed by the caller do not count as a difference.
+    Lists, like the ports of a forward, must hold as many entries as desired,
+    each one compared in order the same way.
+    """
+    if not isinstance(current, dict):
+        return False
+    for key, value in desired.items():
+        if value is None:
+            continue
+        if not _value_is_subset(value, current.get(key)):
+            return False
+    return True
+
+
+def _value_is_subset(desired, current):
+    if isinstance(desired, dict):
+        return is_subset(desired, current)
+    if isinstance(desired, list):
+        return (isinstance(current, list) and len(desired) == len(current)
+                and all(_value_is_subset(d, c) for d, c in zip(desired, current)))
+    return desired == current
+
+
+def predict_response(current=None, payload=None):
+    """Predict the response of a mutation that is skipped in check mode.
+    With a payload the resource is expected to exist afterwards, with the payload
+    merged into the current metadata. Like a PATCH, dict values such as config are
+    merged key by key, other values are replaced. Without a payload the resource
+    is expected to be gone.
+    Returns the response as a dict.
+    """
+    if payload is None:
+        return {'type': 'error', 'status_code': 404, 'error_code': 404, 'metadata': None}
+
+    if current:
+        metadata = copy.deepcopy(current)
+        for key, value in payload.items():
+            if value is None or key not in current:
+                continue
+            if isinstance(value, dict) and isinstance(metadata[key], dict):
+                metadata[key].update(value)
+            else:
+                metadata[key] = value
+    else:
+        metadata = dict((k, v) for k, v in payload.items() if v is not None)
+    return {'type': 'sync', 'status_code': 200, 'error_code': 0, 'metadata': metadata}
+
+
+def map_in_batches(func, items, concurrency=20, batch_size=100, batch_delay=0):
+    """Call func on every item from a pool of concurrency threads.
+    The items are handed out in slices of batch_size, waiting batch_delay
+    seconds between slices so that the server is not flooded.
+    Returns the results as a list, in the same order as the items. The first
+    exception raised by func is raised again once the running calls are done,
+    the items that were not started yet are skipped.
+    """
+    failed = threading.Event()
+
+    def call(item):
+        if failed.is_set():
+            return None
+        try:
+            return func(item)
+        except Exception:
+            failed.set()
+            raise
+
+    results = []
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for start in range(0, len(items), batch_size):
+            if start and batch_delay:
+                time.sleep(batch_delay)
+            futures = [executor.submit(call, item) for item in items[start:start + batch_size]]
+            results.extend(future.result() for future in futures)
+    return results
+
+
 class IncusClient(object):
     def __init__(self, remote='local', project='default', target=None, debug=False, *args, **kwargs):
         self.debug = debug
@@ -31,8 +155,9 @@ class IncusClient(object):
         self.target = target
         self.logs = []
 
-        self._incus_cmd = get_bin_path("incus")
-        if not self._incus_cmd:
+        try:
+            self._incus_cmd = get_bin_path("incus")
+        except ValueError:
             raise IncusClientException("incus command not found in PATH")
 
     def _parseErr(self, returncode, stderr):
@@ -56,10 +181,8 @@ class IncusClient(object):
                 raise IncusClientException(json_data['error'], **err_params)
         return None
 
-    def query_raw(self, method, url, payload=None, url_params=None, ok_errors=None):
-        """Query Incus API.
-        Returns the response as a dict.
-        """
+    def _build_url(self, url, url_params=None):
+        """Add the project and target parameters to an API url."""
         url_params = url_params or {}
         if 'project' not in url_params:
             url_params['project'] = self.project
@@ -67,24 +190,42 @@ class IncusClient(object):
             url_params['target'] = self.target
 
         if '?' in url:
-            url = url + '&' + urlencode(url_params)
-        else:
-            url = url + '?' + urlencode(url_params)
+            return url + '&' + urlencode(url_params)
+        return url + '?' + urlencode(url_params)
 
-        args = ['query', '-X', method, url, '--wait', '--raw']
+    def _build_query(self, method, url, payload=None, url_params=None):
+        """Build the incus CLI arguments for an API query."""
+        args = ['query', '-X', method, self._build_url(url, url_params), '--wait', '--raw']
         if self.debug:
             self.logs.append(args)
 
         if payload and len(payload) > 0:
-            args.extend(["--data", json.dumps(payload)])
+            args.extend(["--data", json_dumps(payload)])
+        return args
 
+    def query_raw(self, method, url, payload=None, url_params=None, ok_errors=None):
+        """Query Incus API.
+        Returns the response as a dict.
+        """
+        args = self._build_query(method, url, payload, url_params)
         response = self._execute(*args)
-        json_data = json.loads(response)
+        json_data = json_loads(response)
 
         self._parsErrFromJson(json_data, ok_errors)
 
         return json_data
 
+    def query_many(self, queries, concurrency=QUERY_CONCURRENCY):
+        """Query Incus API concurrently.
+        Takes a list of dicts with the query_raw arguments and runs at most
+        concurrency incus processes at the same time.
+        Returns the responses as a list of dicts, in the same order as the queries.
+        """
+        def query(query):
+            return self.query_raw(query['method'], query['url'], payload=query.get('payload'),
+                                  url_params=query.get('url_params'), ok_errors=query.get('ok_errors'))
+        return map_in_batches(query, queries, concurrency=concurrency)
+
     def _execute(self, *args):
         """Execute incus command."""
         if self.debug:
@@ -167,4 +308,19 @@ class IncusClient(object):
         Returns a list of instances in a dict.
         """
         data = self._execute('list', '--project', self.project, '--format', 'json', filter)
-        return json.loads(data)
+        return json_loads(data)
+
+
+@functools.lru_cache(maxsize=16)
+def _shared_client(project, debug):
+    return IncusClient(project=project, debug=debug)
+
+
+def get_client(project='default', debug=False):
+    """Get an IncusClient for a project.
+    Modules running in the same interpreter (e.g. under Mitogen) share the client.
+    Every call starts a new module run, so the query logs of earlier runs are dropped.
+    """
+    client = _shared_client(project, debug)
+    client.logs = []
+    return client
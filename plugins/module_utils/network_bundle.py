@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# (c) 2024, Peter Magnusson <me@kmpm.se>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+
+def fetch_all(client, network, listen_address=None, acl_name=None):
+    """Fetch the ACL, network forward and load balancer of a network concurrently.
+    The forward and load balancer are looked up at listen_address, the ACL by acl_name.
+    Returns a tuple of (acl, forward, loadbalancer) metadata dicts, with None for
+    anything that does not exist or was not asked for.
+    """
+    urls = [None, None, None]
+    if acl_name:
+        urls[0] = '/1.0/network-acls/{0}'.format(acl_name)
+    if listen_address:
+        urls[1] = '/1.0/networks/{0}/forwards/{1}'.format(network, listen_address)
+        urls[2] = '/1.0/networks/{0}/load-balancers/{1}'.format(network, listen_address)
+
+    queries = [dict(method='GET', url=url, ok_errors=[404]) for url in urls if url]
+    responses = iter(client.query_many(queries))
+
+    results = []
+    for url in urls:
+        metadata = next(responses).get('metadata') if url else None
+        results.append(metadata or None)
+    return tuple(results)
@@ -24,7 +24,10 @@ options:
     name:
         description:
             - Name of the ACL
-        type: str
+            - A list of names manages several ACLs with the same settings in one task,
+              the per ACL results are then returned in C(results).
+        type: list
+        elements: str
         required: true
     project:
         description:
@@ -79,53 +82,22 @@ EXAMPLES = '''
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import (
-    IncusClient, IncusClientException)
-
-# A map of desired state -> handler method.
-ACTION_DISPATCH = {
-    'present': '_present',
-    'absent': '_absent'
-}
-
-
-class IncusNetworkAclManagement(object):
-    def __init__(self, module, **kwargs):
-        self.module = module
-
-        self.name = self.module.params['name']
-        self.project = self.module.params['project']
-        self.description = self.module.params['description']
-        self.config = self.module.params['config']
-        self.ingress = self.module.params['ingress']
-        self.egress = self.module.params['egress']
-        self.state = self.module.params['state']
-
-        self.debug = self.module._verbosity >= 3
-
-        try:
-            self.client = IncusClient(
-                project=self.project,
-                debug=self.debug
-            )
-        except IncusClientException as e:
-            self.module.fail_json(msg=e.msg)
+from ansible_collections.kmpm.incus.plugins.module_utils.incus_resource import (
+    BaseIncusResource, run_managers)
 
-        self.diff = {'before': {}, 'after': {}}
 
-    def _get_acl(self):
-        url = '/1.0/network-acls/{0}'.format(self.name)
-        return self.client.query_raw('GET', url, ok_errors=[404])
+class IncusNetworkAclManagement(BaseIncusResource):
+    RESOURCE_KEY = 'acl'
+    RESOURCE_URL_LIST = '/1.0/network-acls'
+    RESOURCE_URL_SINGLE = '/1.0/network-acls/{self.name}'
+    MANAGED_FIELDS = ('name', 'description', 'config', 'ingress', 'egress')
 
-    # Drive the state of the ACL to match the specified state, creating or
-    # updating it as necessary.
-    def _present(self):
-        method = 'POST'
+    def _set_params(self, params):
+        self.ingress = params['ingress']
+        self.egress = params['egress']
 
-        if self.diff['before']['state'] == "present":
-            method = 'PATCH'
-
-        payload = {
+    def _build_payload(self):
+        return {
             'name': self.name, # Unused by PATCH / update requests
             'config': self.config,
             'description': self.description,
@@ -133,91 +105,44 @@ class IncusNetworkAclManagement(object):
             'ingress': self.ingress,
         }
 
-        match method:
-            case 'POST':
-                url = '/1.0/network-acls'
-            case 'PATCH':
-                url = '/1.0/network-acls/{0}'.format(self.name)
-            case _:
-                raise Exception("invalid state")
-
-        if not self.module.check_mode:
-            return self.client.query_raw(method, url, payload=payload)
-
-    # Ensure the ACL does not exist.
-    def _absent(self):
-        if self.diff['before']['state'] == "absent":
-            return
-
-        url = '/1.0/network-acls/{0}'.format(self.name)
-
-        if not self.module.check_mode:
-            return self.client.query_raw('DELETE', url)
-
-    def run(self):
-        try:
-            current = self._get_acl()
-
-            # Set the before / after states for the diff output.
-            self.diff['before']['acl'] = current['metadata']
-            self.diff['before']['state'] = _incus_to_module_state(current)
-
-            # Map the current state to an action.
-            action = getattr(self, ACTION_DISPATCH[self.state])
-            action()
-
-            # Refresh the server state after the action was completed.
-            current = self._get_acl()
-            self.diff['after']['acl'] = current['metadata']
-            self.diff['after']['state'] = _incus_to_module_state(current)
-
-            state_changed = self.diff['before']['acl'] != self.diff['after']['acl']
-            result_json = {
-                'log_verbosity': self.module._verbosity,
-                'changed': state_changed,
-                'old_state': self.diff['before']['state'],
-                'diff': self.diff,
-                'acl': self.diff['after']['acl'],
-            }
-            if self.debug:
-                result_json['logs'] = self.client.logs
-
-            self.module.exit_json(**result_json)
-
-        except IncusClientException as e:
-            fail_params = {
-                'msg': e.msg,
-                'changed': False,
-                'diff': self.diff
-            }
-            if self.client.debug:
-                fail_params['logs'] = self.client.logs
-            self.module.fail_json(**fail_params)
-
-def _incus_to_module_state(resp_json):
-    if resp_json['status_code'] == 200:
-        return 'present'
-    if resp_json['error_code'] == 404:
-        return 'absent'
-    raise Exception("unknown resource state")
+
+def run_batch(module, names):
+    '''Manage several ACLs with a single client.'''
+    managers = []
+    for name in names:
+        client = managers[0].client if managers else None
+        managers.append(IncusNetworkAclManagement(
+            module=module, item_params=dict(module.params, name=name), client=client))
+    run_managers(module, managers)
+
+
+ARGUMENT_SPEC = dict(
+    name=dict(type='list', elements='str', required=True),
+    project=dict(type='str', default='default'),
+    description=dict(type='str', required=False),
+    config=dict(type='dict', required=False),
+    ingress=dict(type='list', required=False),
+    egress=dict(type='list', required=False),
+    state=dict(type='str', default='present', choices=['present', 'absent']),
+)
+
 
 def main():
     '''Ansible Main module.'''
 
     module = AnsibleModule(
-        argument_spec=dict(
-            name=dict(type='str', required=True),
-            project=dict(type='str', default='default'),
-            description=dict(type='str', required=False),
-            config=dict(type='dict', required=False),
-            ingress=dict(type='list', required=False),
-            egress=dict(type='list', required=False),
-            state=dict(type='str', default='present', choices=['present', 'absent']),
-        ),
+        argument_spec=ARGUMENT_SPEC,
         supports_check_mode=True
     )
 
-    resource_manager = IncusNetworkAclManagement(module=module)
+    names = module.params['name']
+    if not names:
+        module.fail_json(msg='name must not be empty')
+    if len(names) > 1:
+        run_batch(module, names)
+        return
+
+    resource_manager = IncusNetworkAclManagement(module=module, item_params=dict(module.params, name=names[0]))
     resource_manager.run()
 
 
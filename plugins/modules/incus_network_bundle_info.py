@@ -0,0 +1,130 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# (c) 2024, Peter Magnusson <me@kmpm.se>
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+DOCUMENTATION = '''
+---
+module: incus_network_bundle_info
+author: "Peter Magnusson (@kmpm)"
+short_description: Get an ACL, network forward and load balancer in one task
+description:
+  - Get the current state of a network ACL and of the network forward and load balancer
+    listening on an address, looked up concurrently in a single task.
+extends_documentation_fragment:
+  - kmpm.incus.attributes
+  - kmpm.incus.attributes.info_module
+options:
+    network:
+        description:
+            - Name of the network the forward and load balancer belong to
+        type: str
+        required: true
+    listen_address:
+        description:
+            - IP Address the network forward and load balancer listen on.
+              If empty neither of them will be looked up.
+            - At least one of O(listen_address) and O(acl) is required.
+        type: str
+        required: false
+    acl:
+        description:
+            - Name of the network ACL. If empty no ACL will be looked up.
+            - At least one of O(listen_address) and O(acl) is required.
+        type: str
+        required: false
+    project:
+        description:
+            - Project the resources are part of
+        type: str
+        default: default
+'''
+
+EXAMPLES = '''
+- host: localhost
+  connection: local
+  tasks:
+    - name: Get the ACL, forward and load balancer of my-network
+      kmpm.incus.incus_network_bundle_info:
+        network: my-network
+        listen_address: 10.150.19.10
+        acl: restricted-network
+      register: bundle
+'''
+
+RETURN = r'''
+acl:
+    description: The network ACL, null if it does not exist or O(acl) is not set
+    type: dict
+    returned: success
+forward:
+    description: The network forward, null if it does not exist or O(listen_address) is not set
+    type: dict
+    returned: success
+loadbalancer:
+    description: The load balancer, null if it does not exist or O(listen_address) is not set
+    type: dict
+    returned: success
+'''
+
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import IncusClientException, get_client
+from ansible_collections.kmpm.incus.plugins.module_utils.network_bundle import fetch_all
+
+
+class IncusNetworkBundleInfo(object):
+    def __init__(self, module):
+        self.module = module
+        self.network = module.params['network']
+        self.listen_address = module.params['listen_address']
+        self.acl = module.params['acl']
+        self.project = module.params['project']
+
+        try:
+            self.client = get_client(self.project, False)
+        except IncusClientException as e:
+            self.module.fail_json(msg=e.msg)
+
+    def run(self):
+        result = dict(changed=False, )
+        try:
+            acl, forward, loadbalancer = fetch_all(
+                self.client, self.network, listen_address=self.listen_address, acl_name=self.acl)
+            result['acl'] = acl
+            result['forward'] = forward
+            result['loadbalancer'] = loadbalancer
+
+            self.module.exit_json(**result)
+
+        except IncusClientException as e:
+            self.module.fail_json(msg=e.msg, **e.kwargs)
+
+
+ARGUMENT_SPEC = dict(
+    network=dict(type='str', required=True),
+    listen_address=dict(type='str', required=False),
+    acl=dict(type='str', required=False),
+    project=dict(type='str', default='default'),
+)
+
+
+def main():
+    '''Ansible Main module.'''
+
+    module = AnsibleModule(
+        argument_spec=ARGUMENT_SPEC,
+        required_one_of=[('acl', 'listen_address')],
+        supports_check_mode=True
+    )
+
+    info = IncusNetworkBundleInfo(module)
+    info.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -46,9 +46,13 @@ options:
         type: list
         elements: dict
         required: false
-    listener_address:
-        description: IP Address to listen on
-        type: str
+    listen_address:
+        description:
+            - IP Address to listen on
+            - A list of addresses manages several network forwards with the same settings in one task,
+              the per forward results are then returned in C(results).
+        type: list
+        elements: str
         required: true
     state:
         description:
@@ -77,156 +81,70 @@ EXAMPLES = '''
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import (
-    IncusClient, IncusClientException)
-
-# A map of desired state -> handler method.
-ACTION_DISPATCH = {
-    'present': '_present',
-    'absent': '_absent'
-}
-
-
-class IncusNetworkForwardManagement(object):
-    def __init__(self, module, **kwargs):
-        self.module = module
-
-        self.network = self.module.params['network']
-        self.description = self.module.params['description']
-        self.config = self.module.params['config']
-        self.ports = self.module.params['ports']
-        self.listen_address = self.module.params['listen_address']        
-        self.project = self.module.params['project']
-        self.state = self.module.params['state']
-
-        self.debug = self.module._verbosity >= 3
-
-        try:
-            self.client = IncusClient(
-                project=self.project,
-                debug=self.debug
-            )
-        except IncusClientException as e:
-            self.module.fail_json(msg=e.msg)
-
-        self.diff = {'before': {}, 'after': {}}
-
-    def _get_network_forwards(self):
-        url = '/1.0/networks/{0}/forwards'.format(self.network)
-        return self.client.query_raw('GET', url, ok_errors=[404])
-
-    # Drive the state of the network forward to match the specified state, creating or
-    # updating it as necessary.
-    def _present(self):
-        method = 'POST'
-
-        if self.diff['before']['state'] == "present":
-            method = 'PATCH'
-
-        payload = {
-            'network': self.network,
+from ansible_collections.kmpm.incus.plugins.module_utils.incus_resource import (
+    BaseIncusResource, run_managers)
+
+
+class IncusNetworkForwardManagement(BaseIncusResource):
+    RESOURCE_KEY = 'forward'
+    NAME_PARAM = 'listen_address'
+    RESOURCE_URL_LIST = '/1.0/networks/{self.network}/forwards'
+    RESOURCE_URL_SINGLE = '/1.0/networks/{self.network}/forwards/{self.listen_address}'
+    MANAGED_FIELDS = ('listen_address', 'description', 'config', 'ports')
+
+    def _set_params(self, params):
+        self.network = params['network']
+        self.listen_address = params['listen_address']
+        self.ports = params['ports']
+
+    def _build_payload(self):
+        # The network is part of the URL, not of the forward itself.
+        return {
             'listen_address': self.listen_address,
             'description': self.description,
             'config': self.config,
             'ports': self.ports,
         }
 
-        match method:
-            case 'POST':
-                url = '/1.0/network/{0}/forwards'.format(self.network)
-            case 'PATCH':
-                url = '/1.0/network/{0}/forwards/{1}'.format(self.network,self.listen_address)
-            case _:
-                raise Exception("invalid state")
-        # Check if the forward exists
-        resp = self.client.query_raw("GET", f"/1.0/networks/{self.network}/forwards")
-        existing_forwards = resp.get('metadata', [])
-        
-        if self.listen_address in [f.split("/")[-1] for f in existing_forwards]:
-            method = "PATCH"
-            url = f"/1.0/networks/{self.network}/forwards/{self.listen_address}"
-        else:
-            method = "POST"
-            url = f"/1.0/networks/{self.network}/forwards"
-
-        
-        if not self.module.check_mode:
-            return self.client.query_raw(method, url, payload=payload)
-
-    # Ensure the network forward does not exist.
-    def _absent(self):
-        if self.diff['before']['state'] == "absent":
-            return
-
-        url = '/1.0/network/{0}/forwards/{1}'.format(self.network,self.listen_address)
-
-        if not self.module.check_mode:
-            return self.client.query_raw('DELETE', url)
-
-    def run(self):
-        try:
-            current = self._get_network_forwards()
-
-            # Set the before / after states for the diff output.
-            self.diff['before']['forward'] = current['metadata']
-            self.diff['before']['state'] = _incus_to_module_state(current)
-
-            # Map the current state to an action.
-            action = getattr(self, ACTION_DISPATCH[self.state])
-            action()
-
-            # Refresh the server state after the action was completed.
-            current = self._get_network_forwards()
-            self.diff['after']['forward'] = current['metadata']
-            self.diff['after']['state'] = _incus_to_module_state(current)
-
-            state_changed = self.diff['before']['forward'] != self.diff['after']['forward']
-            result_json = {
-                'log_verbosity': self.module._verbosity,
-                'changed': state_changed,
-                'old_state': self.diff['before']['state'],
-                'diff': self.diff,
-                'forward': self.diff['after']['forward'],
-            }
-            if self.debug:
-                result_json['logs'] = self.client.logs
-
-            self.module.exit_json(**result_json)
-
-        except IncusClientException as e:
-            fail_params = {
-                'msg': e.msg,
-                'changed': False,
-                'diff': self.diff
-            }
-            if self.client.debug:
-                fail_params['logs'] = self.client.logs
-            self.module.fail_json(**fail_params)
-
-def _incus_to_module_state(resp_json):
-    if resp_json['status_code'] == 200:
-        return 'present'
-    if resp_json['error_code'] == 404:
-        return 'absent'
-    raise Exception("unknown resource state")
+
+def run_batch(module, listen_addresses):
+    '''Manage several network forwards with a single client.'''
+    managers = []
+    for listen_address in listen_addresses:
+        client = managers[0].client if managers else None
+        managers.append(IncusNetworkForwardManagement(
+            module=module, item_params=dict(module.params, listen_address=listen_address), client=client))
+    run_managers(module, managers, key='listen_address')
+
+
+ARGUMENT_SPEC = dict(
+    network=dict(type='str', required=True),
+    description=dict(type='str', required=False),
+    config=dict(type='dict', required=False),
+    ports=dict(type='list', elements='dict', required=False),
+    listen_address=dict(type='list', elements='str', required=True),
+    project=dict(type='str', default='default'),
+    state=dict(type='str', default='present', choices=['present', 'absent']),
+)
+
 
 def main():
     '''Ansible Main module.'''
 
     module = AnsibleModule(
-        argument_spec=dict(
-            network=dict(type='str', required=True),
-            description=dict(type='str', required=False),
-            config=dict(type='dict', required=False),
-            ports=dict(type='list', elements='dict', required=False),
-            listen_address=dict(type='str', required=True),
-            project=dict(type='str', default='default'),
-            state=dict(type='str', default='present', choices=['present', 'absent']),
-        ),
+        argument_spec=ARGUMENT_SPEC,
         supports_check_mode=True
     )
 
-    resource_manager = IncusNetworkForwardManagement(module=module)
+    listen_addresses = module.params['listen_address']
+    if not listen_addresses:
+        module.fail_json(msg='listen_address must not be empty')
+    if len(listen_addresses) > 1:
+        run_batch(module, listen_addresses)
+        return
+
+    resource_manager = IncusNetworkForwardManagement(
+        module=module, item_params=dict(module.params, listen_address=listen_addresses[0]))
     resource_manager.run()
 
 
@@ -50,7 +50,10 @@ options:
     listen_address:
         description:
           - the IP address the Load Balancer listens on.
-        type: str
+          - A list of addresses manages several Load Balancers with the same settings in one task,
+            the per Load Balancer results are then returned in C(results).
+        type: list
+        elements: str
         required: true
     project:
         description:
@@ -97,154 +100,79 @@ EXAMPLES = '''
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import (
-    IncusClient, IncusClientException)
-
-# A map of desired state -> handler method.
-ACTION_DISPATCH = {
-    'present': '_present',
-    'absent': '_absent'
-}
-
-
-class IncusNetworkLoadBalancerManagement(object):
-    def __init__(self, module, **kwargs):
-        self.module = module
-
-        self.network = self.module.params['network']
-        self.listen_address = self.module.params['listen_address']
-        self.description = self.module.params['description']
-        self.config = self.module.params['config'] or {}
-        self.backends = self.module.params['backends'] or []
-        self.ports = self.module.params['ports'] or []
-        self.project= self.module.params['project']
-        self.state = self.module.params['state']
-
-        self.debug = self.module._verbosity >= 3
-
-        try:
-            self.client = IncusClient(
-                project=self.project,
-                debug=self.debug
-            )
-        except IncusClientException as e:
-            self.module.fail_json(msg=e.msg)
-
-        self.diff = {'before': {}, 'after': {}}
-
-    def _get_lb(self):
-        url = '/1.0/networks/{0}/load-balancers/{1}'.format(self.network,self.listen_address)
-        return self.client.query_raw('GET', url, ok_errors=[404])
-
-    # Drive the state of the Load Balancer to match the specified state, creating or
-    # updating it as necessary.
-    def _present(self):
-        method = 'POST'
-
-        if self.diff['before']['state'] == "present":
-            method = 'PATCH'
-
-        payload = {
+from ansible_collections.kmpm.incus.plugins.module_utils.incus_resource import (
+    BaseIncusResource, run_managers)
+
+
+class IncusNetworkLoadBalancerManagement(BaseIncusResource):
+    RESOURCE_KEY = 'loadbalancer'
+    NAME_PARAM = 'listen_address'
+    RESOURCE_URL_LIST = '/1.0/networks/{self.network}/load-balancers'
+    RESOURCE_URL_SINGLE = '/1.0/networks/{self.network}/load-balancers/{self.listen_address}'
+    MANAGED_FIELDS = ('listen_address', 'description', 'config', 'backends', 'ports')
+
+    def _set_params(self, params):
+        self.network = params['network']
+        self.listen_address = params['listen_address']
+        self.config = params['config'] or {}
+        self.backends = params['backends'] or []
+        self.ports = params['ports'] or []
+
+    def _build_payload(self):
+        # Incus expects listen_port as a string, normalize the ports in place.
+        for port in self.ports:
+            if not isinstance(port['listen_port'], str):
+                port['listen_port'] = str(port['listen_port'])
+
+        # The network is part of the URL, not of the load balancer itself.
+        return {
             'listen_address': self.listen_address,
             'description': self.description,
-            'network': self.network,
             'config': self.config,
             'backends': self.backends,
-            'ports': [
-                {
-                    **port,
-                    'listen_port': str(port['listen_port'])
-                }
-                for port in self.ports
-            ],
+            'ports': self.ports,
         }
 
-        match method:
-            case 'POST':
-                url = '/1.0/networks/{0}/load-balancers'.format(self.network)
-            case 'PATCH':
-                url = '/1.0/networks/{0}/load-balancers/{1}'.format(self.network,self.listen_address)
-            case _:
-                raise Exception("invalid state")
-
-        if not self.module.check_mode:
-            return self.client.query_raw(method, url, payload=payload)
-
-    # Ensure the Load Balancer does not exist.
-    def _absent(self):
-        if self.diff['before']['state'] == "absent":
-            return
-
-        url = '/1.0/networks/{0}/load-balancers/{1}'.format(self.network,self.listen_address)
-
-        if not self.module.check_mode:
-            return self.client.query_raw('DELETE', url)
-
-    def run(self):
-        try:
-            current = self._get_lb()
-
-            # Set the before / after states for the diff output.
-            self.diff['before']['loadbalancer'] = current['metadata']
-            self.diff['before']['state'] = _incus_to_module_state(current)
-
-            # Map the current state to an action.
-            action = getattr(self, ACTION_DISPATCH[self.state])
-            action()
-
-            # Refresh the server state after the action was completed.
-            current = self._get_lb()
-            self.diff['after']['loadbalancer'] = current['metadata']
-            self.diff['after']['state'] = _incus_to_module_state(current)
-
-            state_changed = self.diff['before']['loadbalancer'] != self.diff['after']['loadbalancer']
-            result_json = {
-                'log_verbosity': self.module._verbosity,
-                'changed': state_changed,
-                'old_state': self.diff['before']['state'],
-                'diff': self.diff,
-                'loadbalancer': self.diff['after']['loadbalancer'],
-            }
-            if self.debug:
-                result_json['logs'] = self.client.logs
-
-            self.module.exit_json(**result_json)
-
-        except IncusClientException as e:
-            fail_params = {
-                'msg': e.msg,
-                'changed': False,
-                'diff': self.diff
-            }
-            if self.client.debug:
-                fail_params['logs'] = self.client.logs
-            self.module.fail_json(**fail_params)
-
-def _incus_to_module_state(resp_json):
-    if resp_json['status_code'] == 200:
-        return 'present'
-    if resp_json['error_code'] == 404:
-        return 'absent'
-    raise Exception("unknown resource state")
+
+def run_batch(module, listen_addresses):
+    '''Manage several load balancers with a single client.'''
+    managers = []
+    for listen_address in listen_addresses:
+        client = managers[0].client if managers else None
+        managers.append(IncusNetworkLoadBalancerManagement(
+            module=module, item_params=dict(module.params, listen_address=listen_address), client=client))
+    run_managers(module, managers, key='listen_address')
+
+
+ARGUMENT_SPEC = dict(
+    network=dict(type='str', required=True),
+    listen_address=dict(type='list', elements='str', required=True),
+    description=dict(type='str'),
+    config=dict(type='dict', default={}),
+    backends=dict(type='list', elements='dict', default=[]),
+    ports=dict(type='list', elements='dict', default=[]),
+    state=dict(type='str', choices=['present', 'absent'], default='present'),
+    project=dict(type="str",default='default'),
+)
+
 
 def main():
     '''Ansible Main module.'''
 
     module = AnsibleModule(
-        argument_spec=dict(
-            network=dict(type='str', required=True),
-            listen_address=dict(type='str', required=True),
-            description=dict(type='str'),
-            config=dict(type='dict', default={}),
-            backends=dict(type='list', elements='dict', default=[]),
-            ports=dict(type='list', elements='dict', default=[]),
-            state=dict(type='str', choices=['present', 'absent'], default='present'),
-            project=dict(type="str",default='default'),
-        ),
+        argument_spec=ARGUMENT_SPEC,
         supports_check_mode=True
     )
 
-    resource_manager = IncusNetworkLoadBalancerManagement(module=module)
+    listen_addresses = module.params['listen_address']
+    if not listen_addresses:
+        module.fail_json(msg='listen_address must not be empty')
+    if len(listen_addresses) > 1:
+        run_batch(module, listen_addresses)
+        return
+
+    resource_manager = IncusNetworkLoadBalancerManagement(
+        module=module, item_params=dict(module.params, listen_address=listen_addresses[0]))
     resource_manager.run()
 
 
@@ -23,14 +23,16 @@ attributes:
 options:
     name:
         description:
-            - Name of the Peer 
+            - Name of the Peer
+            - Either O(name) or O(aggregate) is required.
         type: str
-        required: true
+        required: false
     network:
         description:
             - Name of local OVN network name
+            - Required with O(name).
         type: str
-        required: true
+        required: false
     target_network:
         description:
             - Name of Target local network peer name
@@ -48,12 +50,13 @@ options:
         required: false
     type:
         description:
-            - Type of network peering
+            - Type of network peering, either V(local) or V(remote).
         type: str
         required: false
     target_integration:
         description:
             - Integration name for remote peers
+            - Cannot be combined with O(target_network).
         type: str
         required: false
     target_project:
@@ -72,6 +75,74 @@ options:
         type: str
         choices: [present, absent]
         default: present
+    aggregate:
+        description:
+            - A list of network peers to manage in one task.
+            - Each entry takes the same options as the module, except O(project).
+              Options left out of an entry are taken from the module options.
+            - The per peer results are then returned in C(results).
+        type: list
+        elements: dict
+        aliases: [peers]
+        required: false
+        suboptions:
+            name:
+                description:
+                    - Name of the Peer
+                type: str
+                required: true
+            network:
+                description:
+                    - Name of local OVN network name
+                type: str
+            target_network:
+                description:
+                    - Name of Target local network peer name
+                type: str
+            description:
+                description:
+                    - A description associated with this peer
+                type: str
+            config:
+                description:
+                    - The set of config entries for the network peer
+                type: dict
+            type:
+                description:
+                    - Type of network peering, either V(local) or V(remote).
+                type: str
+            target_integration:
+                description:
+                    - Integration name for remote peers
+                    - Cannot be combined with O(target_network).
+                type: str
+            target_project:
+                description:
+                    - Project the target network exists
+                type: str
+            state:
+                description:
+                    - State of the network peer
+                type: str
+                choices: [present, absent]
+    concurrency:
+        description:
+            - Number of peers from O(aggregate) that are managed at the same time, at least 1.
+        required: false
+        type: int
+        default: 20
+    batch_size:
+        description:
+            - Number of peers from O(aggregate) that are handed out at once, at least 1, see O(batch_delay).
+        required: false
+        type: int
+        default: 100
+    batch_delay:
+        description:
+            - Seconds to wait between two batches of O(batch_size) peers, to not flood the server.
+        required: false
+        type: float
+        default: 0
 '''
 
 EXAMPLES = '''
@@ -95,167 +166,120 @@ EXAMPLES = '''
         target_project: default
         description: "Peering OVN networkings default and test-ovn part 2
         state: present
+
+# Create both peers in a single task
+- hosts: localhost
+  connection: local
+  tasks:
+    - name: Create network peers
+      kmpm.incus.incus_network_peer:
+        target_project: default
+        peers:
+          - name: default-test-ovn
+            network: default
+            target_network: test-ovn
+          - name: test-ovn-default
+            network: test-ovn
+            target_network: default
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import (
-    IncusClient, IncusClientException)
-
-# A map of desired state -> handler method.
-ACTION_DISPATCH = {
-    'present': '_present',
-    'absent': '_absent'
-}
-
+from ansible_collections.kmpm.incus.plugins.module_utils.incus_resource import (
+    BaseIncusResource, run_batch)
 
-class IncusNetworkPeerManagement(object):
-    def __init__(self, module, **kwargs):
-        self.module = module
+# The network peer types known to Incus.
+PEER_TYPES = ('local', 'remote')
 
-        self.name = self.module.params['name']
-        self.network = self.module.params['network']
-        self.target_network = self.module.params['target_network']
-        self.description = self.module.params['description']
-        self.config = self.module.params['config']
-        self.type = self.module.params['type']
-        self.target_integration = self.module.params['target_integration']
-        self.target_project = self.module.params['target_project']
-        self.project = self.module.params['project']
-        self.state = self.module.params['state']
-        self.actions = []
 
-        self.debug = self.module._verbosity >= 3
+class IncusNetworkPeerManagement(BaseIncusResource):
+    RESOURCE_KEY = 'peer'
+    RESOURCE_URL_LIST = '/1.0/networks/{self.network}/peers'
+    RESOURCE_URL_SINGLE = '/1.0/networks/{self.network}/peers/{self.name}'
+    MANAGED_FIELDS = ('name', 'description', 'config', 'target_network', 'target_project',
+                      'target_integration', 'type')
 
-        try:
-            self.client = IncusClient(
-                project=self.project,
-                debug=self.debug
-            )
-        except IncusClientException as e:
-            self.module.fail_json(msg=e.msg)
+    def _set_params(self, params):
+        self.network = params['network']
+        self.target_network = params['target_network']
+        self.type = params['type']
+        self.target_integration = params['target_integration']
+        self.target_project = params['target_project']
 
-        self.diff = {'before': {}, 'after': {}}
-
-    def _get_peer(self):
-        """ Get single network peer for a network """
-        url = '/1.0/networks/{0}/peers/{1}'.format(self.network, self.name)
-        return self.client.query_raw('GET', url, ok_errors=[404])
     def _get_peers(self):
         """ Get network peer list for a network """
-        url = '/1.0/networks/{0}/peers'.format(self.network)
-        return self.client.query_raw('GET', url, ok_errors=[404])
-
-    # Drive the state of the network peer to match the specified state, creating or
-    # updating it as necessary.
-    def _present(self):
-        method = 'POST'
-
-        if self.diff['before']['state'] == "present":
-            method = 'PATCH'
-
-        payload = {
-            'name': self.name, 
-            'config': self.config,
-            'description': self.description,
-        }
-
-        if self.target_network:
-            payload['target_network'] = self.target_network
-            if self.target_project:
-                payload['target_project'] = self.target_project
-        if self.target_integration:
-            payload['target_integration'] = self.target_integration
-        if self.type:
-            payload['type'] = self.type
-
-        if method == 'POST':
-            url = '/1.0/networks/{0}/peers'.format(self.network)
-        else:
-            url = '/1.0/networks/{0}/peers/{1}'.format(self.network, self.name)
-
-        if not self.module.check_mode:
-            res = self.client.query_raw(method, url, payload=payload)
-        else:
-            res = None
-
-        self.actions.append('create' if method == 'POST' else 'update')
-        return res
-
-    # Ensure the network Peer does not exist.
-    def _absent(self):
-        if self.diff['before']['state'] == "absent":
-            return
-        url = '/1.0/networks/{0}/peers/{1}'.format(self.network, self.name)
-        if not self.module.check_mode:
-            return self.client.query_raw('DELETE', url)
-        self.actions.append('delete')
+        return self.client.query_raw('GET', self._base_url, ok_errors=[404])
+
+    def _build_payload(self):
+        # Options left unset are not sent, target_project only goes with target_network.
+        fields = (
+            ('name', self.name),
+            ('config', self.config),
+            ('description', self.description),
+            ('target_network', self.target_network),
+            ('target_project', self.target_project if self.target_network else None),
+            ('target_integration', self.target_integration),
+            ('type', self.type),
+        )
+        return {k: v for k, v in fields if v is not None}
+
+    def _validate(self):
+        if not self.network:
+            return 'network is required for network peer {0}'.format(self.name)
+        if self.state != 'present':
+            return None
+        if self.target_network and self.target_integration:
+            return 'target_network and target_integration are mutually exclusive for network peer {0}'.format(self.name)
+        if self.type is not None and self.type not in PEER_TYPES:
+            return 'type must be one of {0} for network peer {1}, got {2}'.format(', '.join(PEER_TYPES), self.name, self.type)
+        return None
+
+
+ARGUMENT_SPEC = dict(
+    name=dict(type='str', required=False),
+    network=dict(type='str', required=False),
+    target_network=dict(type='str', required=False),
+    description=dict(type='str', required=False),
+    config=dict(type='dict', required=False),
+    type=dict(type='str', required=False),
+    target_integration=dict(type='str', required=False),
+    target_project=dict(type='str', required=False),
+    project=dict(type='str', default='default'),
+    state=dict(type='str', default='present', choices=['present', 'absent']),
+    aggregate=dict(type='list', elements='dict', aliases=['peers'], options=dict(
+        name=dict(type='str', required=True),
+        network=dict(type='str'),
+        target_network=dict(type='str'),
+        description=dict(type='str'),
+        config=dict(type='dict'),
+        type=dict(type='str'),
+        target_integration=dict(type='str'),
+        target_project=dict(type='str'),
+        state=dict(type='str', choices=['present', 'absent']),
+    )),
+    concurrency=dict(type='int', default=20),
+    batch_size=dict(type='int', default=100),
+    batch_delay=dict(type='float', default=0),
+)
 
-    def run(self):
-        try:
-            current = self._get_peer()
-
-            # Set the before / after states for the diff output.
-            self.diff['before']['peer'] = current['metadata']
-            self.diff['before']['state'] = _incus_to_module_state(current)
-
-            # Map the current state to an action.
-            action = getattr(self, ACTION_DISPATCH[self.state])
-            action()
-
-            # Refresh the server state after the action was completed.
-            current = self._get_peer()
-            self.diff['after']['peer'] = current['metadata']
-            self.diff['after']['state'] = _incus_to_module_state(current)
-
-            state_changed = self.diff['before']['peer'] != self.diff['after']['peer']
-            result_json = {
-                'log_verbosity': self.module._verbosity,
-                'changed': state_changed,
-                'old_state': self.diff['before']['state'],
-                'diff': self.diff,
-                'peer': self.diff['after']['peer'],
-            }
-            if self.debug:
-                result_json['logs'] = self.client.logs
-
-            self.module.exit_json(**result_json)
-
-        except IncusClientException as e:
-            fail_params = {
-                'msg': e.msg,
-                'changed': False,
-                'diff': self.diff
-            }
-            if self.client.debug:
-                fail_params['logs'] = self.client.logs
-            self.module.fail_json(**fail_params)
-
-def _incus_to_module_state(resp_json):
-    if resp_json['status_code'] == 200:
-        return 'present'
-    if resp_json['error_code'] == 404:
-        return 'absent'
-    raise Exception("unknown resource state")
 
 def main():
     '''Ansible Main module.'''
 
     module = AnsibleModule(
-        argument_spec=dict(
-            name=dict(type='str', required=True),
-            network=dict(type='str', required=True),
-            target_network=dict(type='str', required=True),
-            description=dict(type='str', required=False),
-            config=dict(type='dict', required=False),
-            type=dict(type='str', required=False),
-            target_integration=dict(type='str', required=False),
-            target_project=dict(type='str', required=False),
-            project=dict(type='str', default='default'),
-            state=dict(type='str', default='present', choices=['present', 'absent']),
-        ),
+        argument_spec=ARGUMENT_SPEC,
+        required_one_of=[('name', 'aggregate')],
+        mutually_exclusive=[('name', 'aggregate')],
+        required_by={'name': 'network'},
         supports_check_mode=True
     )
 
+    aggregate = module.params['aggregate']
+    if aggregate is not None:
+        if not aggregate:
+            module.fail_json(msg='aggregate must not be empty')
+        run_batch(module, aggregate, IncusNetworkPeerManagement)
+        return
+
     resource_manager = IncusNetworkPeerManagement(module=module)
     resource_manager.run()
 
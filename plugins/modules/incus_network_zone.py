@@ -19,7 +19,8 @@ options:
   name:
     description:
       - Name of the network zone.
-    required: true
+      - Either O(name) or O(aggregate) is required.
+    required: false
     type: str
   description:
     description:
@@ -43,6 +44,53 @@ options:
     choices: [present, absent]
     default: present
     type: str
+  aggregate:
+    description:
+      - A list of network zones to manage in one task.
+      - Each entry takes the same options as the module, except O(project).
+        Options left out of an entry are taken from the module options.
+      - The per zone results are then returned in C(results).
+    required: false
+    type: list
+    elements: dict
+    aliases: [zones]
+    suboptions:
+      name:
+        description:
+          - Name of the network zone.
+        required: true
+        type: str
+      description:
+        description:
+          - Description of the network zone.
+        type: str
+      config:
+        description:
+          - Dictionary of network zone configuration options.
+        type: dict
+      state:
+        description:
+          - Whether the network zone should be present or absent.
+        choices: [present, absent]
+        type: str
+  concurrency:
+    description:
+      - Number of zones from O(aggregate) that are managed at the same time, at least 1.
+    required: false
+    type: int
+    default: 20
+  batch_size:
+    description:
+      - Number of zones from O(aggregate) that are handed out at once, at least 1, see O(batch_delay).
+    required: false
+    type: int
+    default: 100
+  batch_delay:
+    description:
+      - Seconds to wait between two batches of O(batch_size) zones, to not flood the server.
+    required: false
+    type: float
+    default: 0
 '''
 
 EXAMPLES = '''
@@ -57,141 +105,73 @@ EXAMPLES = '''
           dns.nameservers: incus.example.net
           peers.ns.address: 127.0.0.1
         state: present
+
+    - name: Create several network zones in one task
+      kmpm.incus.incus_network_zone:
+        description: Managed by Ansible
+        zones:
+          - name: one.example.org
+          - name: two.example.org
+            config:
+              dns.nameservers: incus.example.net
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import (
-    IncusClient, IncusClientException)
-
-# A map of desired state -> handler method.
-ACTION_DISPATCH = {
-    'present': '_present',
-    'absent': '_absent'
-}
-
-
-class IncusNetworkZoneManagement(object):
-    def __init__(self, module, **kwargs):
-        self.module = module
-
-        self.name = self.module.params['name']
-        self.project = self.module.params['project']
-        self.description = self.module.params['description']
-        self.config = self.module.params['config']
-        self.state = self.module.params['state']
-
-        self.debug = self.module._verbosity >= 3
-
-        try:
-            self.client = IncusClient(
-                project=self.project,
-                debug=self.debug
-            )
-        except IncusClientException as e:
-            self.module.fail_json(msg=e.msg)
-
-        self.diff = {'before': {}, 'after': {}}
-
-    def _get_network_zone(self):
-        url = '/1.0/network-zones/{0}'.format(self.name)
-        return self.client.query_raw('GET', url, ok_errors=[404])
-
-    # Drive the state of the Network zones to match the specified state, creating or
-    # updating it as necessary.
-    def _present(self):
-        method = 'POST'
-
-        if self.diff['before']['state'] == "present":
-            method = 'PATCH'
-
-        payload = {
-            'name': self.name, 
-            'description': self.description,
-            'config': self.config,
-        }
-
-        match method:
-            case 'POST':
-                url = '/1.0/network-zones'
-            case 'PATCH':
-                url = '/1.0/network-zones/{0}'.format(self.name)
-            case _:
-                raise Exception("invalid state")
-
-        if not self.module.check_mode:
-            return self.client.query_raw(method, url, payload=payload)
-
-    # Ensure the network zone does not exist.
-    def _absent(self):
-        if self.diff['before']['state'] == "absent":
-            return
-
-        url = '/1.0/network-zones/{0}'.format(self.name)
-
-        if not self.module.check_mode:
-            return self.client.query_raw('DELETE', url)
-
-    def run(self):
-        try:
-            current = self._get_network_zone()
-
-            # Set the before / after states for the diff output.
-            self.diff['before']['zone'] = current['metadata']
-            self.diff['before']['state'] = _incus_to_module_state(current)
-
-            # Map the current state to an action.
-            action = getattr(self, ACTION_DISPATCH[self.state])
-            action()
-
-            # Refresh the server state after the action was completed.
-            current = self._get_network_zone()
-            self.diff['after']['zone'] = current['metadata']
-            self.diff['after']['state'] = _incus_to_module_state(current)
-
-            state_changed = self.diff['before']['zone'] != self.diff['after']['zone']
-            result_json = {
-                'log_verbosity': self.module._verbosity,
-                'changed': state_changed,
-                'old_state': self.diff['before']['state'],
-                'diff': self.diff,
-                'zone': self.diff['after']['zone'],
-            }
-            if self.debug:
-                result_json['logs'] = self.client.logs
-
-            self.module.exit_json(**result_json)
-
-        except IncusClientException as e:
-            fail_params = {
-                'msg': e.msg,
-                'changed': False,
-                'diff': self.diff
-            }
-            if self.client.debug:
-                fail_params['logs'] = self.client.logs
-            self.module.fail_json(**fail_params)
-
-def _incus_to_module_state(resp_json):
-    if resp_json['status_code'] == 200:
-        return 'present'
-    if resp_json['error_code'] == 404:
-        return 'absent'
-    raise Exception("unknown resource state")
+from ansible_collections.kmpm.incus.plugins.module_utils.incus_resource import (
+    BaseIncusResource, run_batch)
+
+
+class IncusNetworkZoneManagement(BaseIncusResource):
+    RESOURCE_KEY = 'zone'
+    RESOURCE_URL_LIST = '/1.0/network-zones'
+    RESOURCE_URL_SINGLE = '/1.0/network-zones/{self.name}'
+    MANAGED_FIELDS = ('name', 'description', 'config')
+
+    def _build_payload(self):
+        # Options left unset are not sent.
+        fields = (
+            ('name', self.name),
+            ('description', self.description),
+            ('config', self.config),
+        )
+        return {k: v for k, v in fields if v is not None}
+
+
+ARGUMENT_SPEC = dict(
+    name=dict(type='str', required=False),
+    description=dict(type='str', required=False),
+    config=dict(type='dict', required=False),
+    project=dict(type='str', default='default'),
+    state=dict(type='str', default='present', choices=['present', 'absent']),
+    aggregate=dict(type='list', elements='dict', aliases=['zones'], options=dict(
+        name=dict(type='str', required=True),
+        description=dict(type='str'),
+        config=dict(type='dict'),
+        state=dict(type='str', choices=['present', 'absent']),
+    )),
+    concurrency=dict(type='int', default=20),
+    batch_size=dict(type='int', default=100),
+    batch_delay=dict(type='float', default=0),
+)
+
 
 def main():
     '''Ansible Main module.'''
 
     module = AnsibleModule(
-        argument_spec=dict(
-            name=dict(type='str', required=True),
-            description=dict(type='str', required=False),
-            config=dict(type='dict', required=False),
-            project=dict(type='str', default='default'),
-            state=dict(type='str', default='present', choices=['present', 'absent']),
-        ),
+        argument_spec=ARGUMENT_SPEC,
+        required_one_of=[('name', 'aggregate')],
+        mutually_exclusive=[('name', 'aggregate')],
         supports_check_mode=True
     )
 
+    aggregate = module.params['aggregate']
+    if aggregate is not None:
+        if not aggregate:
+            module.fail_json(msg='aggregate must not be empty')
+        run_batch(module, aggregate, IncusNetworkZoneManagement)
+        return
+
     resource_manager = IncusNetworkZoneManagement(module=module)
     resource_manager.run()
 
@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import pytest
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import IncusClientException
+from ansible_collections.kmpm.incus.plugins.module_utils.incus_resource import (
+    BaseIncusResource, lookup_each, prefetch, run_batch, run_managers)
+from ansible_collections.kmpm.incus.plugins.modules.incus_network_acl import IncusNetworkAclManagement
+from ansible_collections.kmpm.incus.plugins.modules.incus_network_forward import IncusNetworkForwardManagement
+from ansible_collections.kmpm.incus.plugins.modules.incus_network_load_balancer import (
+    IncusNetworkLoadBalancerManagement)
+from ansible_collections.kmpm.incus.plugins.modules.incus_network_peer import IncusNetworkPeerManagement
+
+
+class FakeResource(BaseIncusResource):
+    RESOURCE_KEY = 'thing'
+    RESOURCE_URL_LIST = '/1.0/things'
+    RESOURCE_URL_SINGLE = '/1.0/things/{self.name}'
+    MANAGED_FIELDS = ('name', 'description', 'config')
+
+    def _build_payload(self):
+        return {'name': self.name, 'description': self.description, 'config': self.config}
+
+
+def make_resource(check_mode=False, diff=False, **params):
+    module = MagicMock(check_mode=check_mode, _verbosity=0, _diff=diff)
+    module.params = dict(name='t1', description='d', config=None, project='default', state='present')
+    module.params.update(params)
+    return FakeResource(module=module, client=MagicMock())
+
+
+def test_urls():
+    resource = make_resource()
+    assert resource._base_url == '/1.0/things'
+    assert resource._resource_url == '/1.0/things/t1'
+
+
+def test_build_payload_required():
+    class NoPayload(BaseIncusResource):
+        RESOURCE_URL_LIST = '/1.0/things'
+        RESOURCE_URL_SINGLE = '/1.0/things/{self.name}'
+
+    with pytest.raises(TypeError):
+        NoPayload(module=MagicMock(), client=MagicMock())
+
+
+def test_apply_converged():
+    resource = make_resource()
+    resource.client.query_raw.return_value = {
+        'type': 'sync', 'status_code': 200, 'error_code': 0,
+        'metadata': {'name': 't1', 'description': 'd', 'used_by': []}}
+    result = resource._apply()
+    assert result['changed'] is False
+    assert result['thing'] == {'name': 't1', 'description': 'd', 'used_by': []}
+    assert 'diff' not in result
+    resource.client.query_raw.assert_called_once_with('GET', '/1.0/things/t1', ok_errors=[404])
+
+
+def test_apply_create_check_mode():
+    resource = make_resource(check_mode=True, diff=True)
+    resource.client.query_raw.return_value = {
+        'type': 'error', 'status_code': 0, 'error_code': 404, 'metadata': None}
+    result = resource._apply()
+    assert result['changed'] is True
+    assert result['old_state'] == 'absent'
+    assert result['thing'] == {'name': 't1', 'description': 'd'}
+    assert result['diff']['after']['thing'] == {'name': 't1', 'description': 'd'}
+    resource.client.query_raw.assert_called_once_with('GET', '/1.0/things/t1', ok_errors=[404])
+
+
+def test_apply_already_absent():
+    resource = make_resource(state='absent')
+    resource.client.query_raw.return_value = {
+        'type': 'error', 'status_code': 0, 'error_code': 404, 'metadata': None}
+    result = resource._apply()
+    assert result['changed'] is False
+    assert resource.actions == ['noop']
+    resource.client.query_raw.assert_called_once_with('GET', '/1.0/things/t1', ok_errors=[404])
+
+
+def test_apply_delete():
+    resource = make_resource(state='absent')
+    resource.client.query_raw.side_effect = [
+        {'type': 'sync', 'status_code': 200, 'error_code': 0, 'metadata': {'name': 't1'}},
+        {'type': 'sync', 'status_code': 200, 'error_code': 0, 'metadata': {}},
+    ]
+    result = resource._apply()
+    assert result['changed'] is True
+    assert result['thing'] is None
+    # No GET after the DELETE.
+    assert resource.client.query_raw.call_count == 2
+    assert resource.client.query_raw.call_args[0] == ('DELETE', '/1.0/things/t1')
+
+
+def make_lb(check_mode=False, **params):
+    module = MagicMock(check_mode=check_mode, _verbosity=0, _diff=False)
+    module.params = dict(network='n1', listen_address='10.0.0.5', description=None, config={}, backends=[],
+                         ports=[], project='default', state='present')
+    module.params.update(params)
+    return IncusNetworkLoadBalancerManagement(module=module, client=MagicMock())
+
+
+def test_lb_converged_check_mode():
+    lb = make_lb(check_mode=True, ports=[{'protocol': 'tcp', 'listen_port': 80, 'target_backend': ['b1']}])
+    # The server fills in the port description left out of the task.
+    lb.client.query_raw.return_value = {
+        'type': 'sync', 'status_code': 200, 'error_code': 0,
+        'metadata': {'listen_address': '10.0.0.5', 'description': '', 'config': {}, 'backends': [],
+                     'ports': [{'protocol': 'tcp', 'listen_port': '80', 'target_backend': ['b1'],
+                                'description': ''}]}}
+    result = lb._apply()
+    assert result['changed'] is False
+    assert lb.actions == ['noop']
+    lb.client.query_raw.assert_called_once_with('GET', '/1.0/networks/n1/load-balancers/10.0.0.5', ok_errors=[404])
+
+
+def test_lb_listen_port_normalized():
+    ports = [{'protocol': 'tcp', 'listen_port': 80}, {'protocol': 'udp', 'listen_port': '53'}]
+    lb = make_lb(ports=ports)
+    payload = lb._build_payload()
+    assert [port['listen_port'] for port in payload['ports']] == ['80', '53']
+    # The ports are normalized in place.
+    assert ports[0]['listen_port'] == '80'
+
+
+def make_acl(state='present', **params):
+    module = MagicMock(check_mode=False, _verbosity=0, _diff=False)
+    module.params = dict(name=['a1'], description='d', config=None, ingress=None, egress=None,
+                         project='default', state=state)
+    module.params.update(params)
+    return IncusNetworkAclManagement(module=module, item_params=dict(module.params, name='a1'), client=MagicMock())
+
+
+def acl_response(**metadata):
+    return {'type': 'sync', 'status_code': 200, 'error_code': 0, 'metadata': dict(name='a1', **metadata)}
+
+
+ABSENT = {'type': 'error', 'status_code': 0, 'error_code': 404, 'metadata': None}
+
+
+def test_acl_create():
+    acl = make_acl()
+    acl.client.query_raw.side_effect = [ABSENT, acl_response(description='d')]
+    result = acl._apply()
+    assert result['changed'] is True
+    assert result['old_state'] == 'absent'
+    assert acl.client.query_raw.call_args[0] == ('POST', '/1.0/network-acls')
+
+
+def test_acl_already_absent():
+    acl = make_acl(state='absent')
+    acl.client.query_raw.return_value = ABSENT
+    assert acl._apply()['changed'] is False
+    acl.client.query_raw.assert_called_once()
+
+
+def test_acl_delete():
+    acl = make_acl(state='absent')
+    acl.client.query_raw.side_effect = [acl_response(description='d'), {'metadata': {}}]
+    result = acl._apply()
+    assert result['changed'] is True
+    assert result['acl'] is None
+
+
+def test_acl_update():
+    acl = make_acl(description='new')
+    acl.client.query_raw.side_effect = [
+        acl_response(description='old', used_by=[]),
+        acl_response(description='new', used_by=[]),
+    ]
+    result = acl._apply()
+    assert result['changed'] is True
+    assert acl.client.query_raw.call_args[0] == ('PATCH', '/1.0/network-acls/a1')
+
+
+def test_acl_update_unmanaged_field():
+    # used_by is filled in by the server and does not count as a change.
+    acl = make_acl(egress=[{'action': 'allow'}])
+    acl.client.query_raw.side_effect = [
+        acl_response(description='d', egress=[], used_by=[]),
+        acl_response(description='d', egress=[], used_by=['/1.0/instances/c1']),
+    ]
+    assert acl._apply()['changed'] is False
+
+
+def test_forward_urls():
+    module = MagicMock(check_mode=False, _verbosity=0, _diff=False)
+    module.params = dict(network='n1', listen_address=['10.0.0.1'], description=None, config=None, ports=None,
+                         project='default', state='present')
+    forward = IncusNetworkForwardManagement(
+        module=module, item_params=dict(module.params, listen_address='10.0.0.1'), client=MagicMock())
+    assert forward.name == '10.0.0.1'
+    assert forward._base_url == '/1.0/networks/n1/forwards'
+    assert forward._resource_url == '/1.0/networks/n1/forwards/10.0.0.1'
+    assert 'network' not in forward._build_payload()
+
+
+def test_prefetch():
+    client = MagicMock()
+    client.query_many.return_value = [
+        {'type': 'sync', 'status_code': 200, 'error_code': 0, 'metadata': [{'name': 't1', 'description': 'd'}]},
+    ]
+    managers = [make_resource(name='t1'), make_resource(name='t2')]
+    currents = prefetch(client, managers)
+    assert [q['url'] for q in client.query_many.call_args[0][0]] == ['/1.0/things']
+    assert currents[0]['metadata'] == {'name': 't1', 'description': 'd'}
+    assert currents[1]['error_code'] == 404
+
+
+def test_prefetch_missing_collection():
+    client = MagicMock()
+    client.query_many.return_value = [{'type': 'error', 'status_code': 0, 'error_code': 404, 'metadata': None}]
+    assert prefetch(client, [make_resource()]) == [None]
+
+
+class ModuleExit(Exception):
+    def __init__(self, failed, result):
+        self.failed = failed
+        self.result = result
+
+
+def make_module(diff=False):
+    module = MagicMock(_verbosity=0, _diff=diff)
+    module.exit_json.side_effect = lambda **kwargs: (_ for _ in ()).throw(ModuleExit(False, kwargs))
+    module.fail_json.side_effect = lambda **kwargs: (_ for _ in ()).throw(ModuleExit(True, kwargs))
+    return module
+
+
+def make_manager(name, result=None, error=None, invalid=None):
+    manager = MagicMock(client=MagicMock(debug=False), _resource_url='/1.0/things/' + name)
+    manager.name = name
+    manager._validate.return_value = invalid
+    if error:
+        manager._apply.side_effect = IncusClientException(error)
+    else:
+        manager._apply.return_value = dict(result or {'changed': False}, diff={})
+    return manager
+
+
+def test_lookup_each():
+    client = MagicMock()
+    lookup_each(client, [make_manager('t1'), make_manager('t2')])
+    assert [q['url'] for q in client.query_many.call_args[0][0]] == ['/1.0/things/t1', '/1.0/things/t2']
+
+
+def test_run_managers():
+    managers = [make_manager('t1'), make_manager('t2', {'changed': True})]
+    lookup = MagicMock(return_value=['c1', 'c2'])
+    with pytest.raises(ModuleExit) as e:
+        run_managers(make_module(), managers, lookup=lookup)
+    assert not e.value.failed
+    assert e.value.result['changed'] is True
+    assert [r['name'] for r in e.value.result['results']] == ['t1', 't2']
+    assert 'diff' not in e.value.result
+    managers[0]._apply.assert_called_once_with('c1')
+    managers[1]._apply.assert_called_once_with('c2')
+
+
+def test_run_managers_diff():
+    with pytest.raises(ModuleExit) as e:
+        run_managers(make_module(diff=True), [make_manager('t1')], lookup=MagicMock(return_value=[None]))
+    assert e.value.result['diff'] == [{}]
+
+
+def test_run_managers_invalid():
+    managers = [make_manager('t1', invalid='bad t1'), make_manager('t2', {'changed': True})]
+    lookup = MagicMock(return_value=[None])
+    with pytest.raises(ModuleExit) as e:
+        run_managers(make_module(), managers, lookup=lookup)
+    assert e.value.failed
+    assert e.value.result['msg'] == 'bad t1'
+    assert e.value.result['changed'] is True
+    assert lookup.call_args[0][1] == [managers[1]]
+    managers[0]._apply.assert_not_called()
+
+
+def test_run_managers_error():
+    managers = [make_manager('t1', {'changed': True}), make_manager('t2', error='boom'), make_manager('t3')]
+    with pytest.raises(ModuleExit) as e:
+        run_managers(make_module(), managers, lookup=MagicMock(return_value=[None] * 3))
+    assert e.value.failed
+    assert e.value.result['msg'] == 'boom'
+    assert e.value.result['changed'] is True
+    assert [r['name'] for r in e.value.result['results']] == ['t1']
+    # The items after the failing one are not applied.
+    managers[2]._apply.assert_not_called()
+
+
+def make_peer(**params):
+    module = MagicMock(check_mode=False, _verbosity=0, _diff=False)
+    module.params = dict(name='p1', network='n1', description=None, config=None, target_network='n2',
+                         target_project=None, target_integration=None, type=None, project='default',
+                         state='present')
+    module.params.update(params)
+    return IncusNetworkPeerManagement(module=module, client=MagicMock())
+
+
+@pytest.mark.parametrize('params, error', [
+    ({}, None),
+    ({'type': 'local'}, None),
+    ({'network': None}, 'network is required for network peer p1'),
+    ({'target_integration': 'ovn1'},
+     'target_network and target_integration are mutually exclusive for network peer p1'),
+    ({'type': 'bad'}, 'type must be one of local, remote for network peer p1, got bad'),
+    # Only the network is needed to delete a peer.
+    ({'state': 'absent', 'type': 'bad', 'target_integration': 'ovn1'}, None),
+])
+def test_peer_validate(params, error):
+    assert make_peer(**params)._validate() == error
+
+
+@pytest.mark.parametrize('option, value, msg', [
+    ('concurrency', 0, 'concurrency must be at least 1, got 0'),
+    ('batch_size', 0, 'batch_size must be at least 1, got 0'),
+    ('batch_delay', -1, 'batch_delay must not be negative, got -1'),
+])
+def test_run_batch_options(option, value, msg):
+    module = make_module()
+    module.params = dict(concurrency=1, batch_size=100, batch_delay=0)
+    module.params[option] = value
+    with pytest.raises(ModuleExit) as e:
+        run_batch(module, [{'name': 't1'}], FakeResource)
+    assert e.value.failed
+    assert e.value.result['msg'] == msg
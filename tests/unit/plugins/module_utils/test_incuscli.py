@@ -7,6 +7,8 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import json
+
 import pytest
 try:
     from unittest.mock import patch
@@ -14,13 +16,15 @@ except ImportError:
     from mock import patch
 
 # from ansible_collections.community.general.tests.unit.compat.mock import patch
-from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import IncusClient
+from ansible_collections.kmpm.incus.plugins.module_utils.incuscli import (
+    IncusClient, IncusClientException, _shared_client, get_client, incus_to_module_state, is_subset, json_dumps,
+    json_loads, map_in_batches, predict_response)
 
 
 @patch("ansible_collections.kmpm.incus.plugins.module_utils.incuscli.get_bin_path", side_effect=ValueError('boom'))
 def test_valid_invalid_bin(_get_bin_path):
     # print(dir(_get_bin_path))
-    with pytest.raises(ValueError):
+    with pytest.raises(IncusClientException):
         _get_bin_path.return_value = ''
         client = IncusClient()
         # _get_bin_path.assert_called_once()
@@ -32,3 +36,113 @@ def test_instanciation(_get_bin_path):
     client = IncusClient()
     _get_bin_path.assert_called_once()
     assert client is not None
+
+
+@patch("ansible_collections.kmpm.incus.plugins.module_utils.incuscli.get_bin_path", autospec=True)
+def test_query_many(_get_bin_path, tmp_path):
+    # a fake incus cli that answers with the queried url
+    fake_incus = tmp_path / 'incus'
+    fake_incus.write_text('#!/bin/sh\necho "{\\"type\\": \\"sync\\", \\"status_code\\": 200, \\"metadata\\": \\"$4\\"}"\n')
+    fake_incus.chmod(0o755)
+    _get_bin_path.return_value = str(fake_incus)
+
+    client = IncusClient(project='other')
+    queries = [
+        dict(method='GET', url='/1.0/network-acls/a'),
+        dict(method='GET', url='/1.0/network-acls/b'),
+        dict(method='GET', url='/1.0/network-acls/c'),
+    ]
+    expected = [
+        '/1.0/network-acls/a?project=other',
+        '/1.0/network-acls/b?project=other',
+        '/1.0/network-acls/c?project=other',
+    ]
+    assert [r['metadata'] for r in client.query_many(queries)] == expected
+    assert [r['metadata'] for r in client.query_many(queries, concurrency=1)] == expected
+
+
+def test_predict_response():
+    current = {'name': 'web', 'description': '', 'config': {}}
+    response = predict_response(current, {'name': 'web', 'description': 'Web', 'egress': None, 'network': 'n1'})
+    assert response['status_code'] == 200
+    assert response['metadata'] == {'name': 'web', 'description': 'Web', 'config': {}}
+    assert current['description'] == ''
+
+    # config keys are merged as a PATCH does, lists are replaced
+    current = {'name': 'web', 'config': {'user.a': '0', 'user.b': '2'}, 'egress': [{'action': 'allow'}]}
+    response = predict_response(current, {'config': {'user.a': '1'}, 'egress': []})
+    assert response['metadata'] == {'name': 'web', 'config': {'user.a': '1', 'user.b': '2'}, 'egress': []}
+    assert current['config'] == {'user.a': '0', 'user.b': '2'}
+
+    response = predict_response(None, {'name': 'web', 'egress': None})
+    assert response['metadata'] == {'name': 'web'}
+
+    response = predict_response()
+    assert response['error_code'] == 404
+    assert response['metadata'] is None
+
+
+def test_incus_to_module_state():
+    assert incus_to_module_state({'status_code': 200, 'error_code': 0}) == 'present'
+    assert incus_to_module_state({'status_code': 0, 'error_code': 404}) == 'absent'
+    with pytest.raises(Exception):
+        incus_to_module_state({'status_code': 0, 'error_code': 500})
+
+
+def test_json_roundtrip():
+    data = {'name': 'web', 'config': {'limits.cpu': 2}, 'ports': [{'listen_port': '80'}]}
+    assert json.loads(json_dumps(data)) == data
+    assert json_loads(json_dumps(data)) == data
+
+
+@patch("ansible_collections.kmpm.incus.plugins.module_utils.incuscli.get_bin_path", autospec=True)
+def test_get_client(_get_bin_path):
+    _get_bin_path.return_value = '/usr/bin/incus'
+    _shared_client.cache_clear()
+    client = get_client('default', False)
+    client.logs.append(['query', '-X', 'GET', '/1.0'])
+    assert get_client('default', False) is client
+    assert client.logs == []
+    assert get_client('other', False) is not client
+    assert _get_bin_path.call_count == 2
+
+
+def test_is_subset():
+    current = {'name': 'z', 'description': 'Zone', 'config': {'dns.nameservers': 'ns1', 'peers.ns.address': '127.0.0.1'}}
+    assert is_subset({'name': 'z', 'description': None, 'config': {'dns.nameservers': 'ns1'}}, current)
+    assert not is_subset({'name': 'z', 'config': {'dns.nameservers': 'ns2'}}, current)
+    assert not is_subset({'description': 'Other'}, current)
+    assert not is_subset({'name': 'z'}, None)
+
+
+def test_is_subset_lists():
+    # The server fills in the port description left out of the task.
+    current = {'ports': [{'listen_port': '80', 'protocol': 'tcp', 'description': ''}], 'backends': []}
+    assert is_subset({'ports': [{'listen_port': '80', 'protocol': 'tcp'}], 'backends': []}, current)
+    assert not is_subset({'ports': [{'listen_port': '81', 'protocol': 'tcp'}]}, current)
+    assert not is_subset({'ports': []}, current)
+    assert not is_subset({'backends': [{'name': 'b1'}]}, current)
+
+
+def test_map_in_batches():
+    items = list(range(7))
+    assert map_in_batches(lambda x: x * 2, items, concurrency=3, batch_size=3) == [x * 2 for x in items]
+    assert map_in_batches(lambda x: x, []) == []
+
+    def fail(x):
+        if x == 4:
+            raise ValueError(x)
+        return x
+
+    with pytest.raises(ValueError):
+        map_in_batches(fail, items, batch_size=2)
+
+    called = []
+
+    def record(x):
+        called.append(x)
+        return fail(x)
+
+    with pytest.raises(ValueError):
+        map_in_batches(record, items, concurrency=1)
+    assert called == [0, 1, 2, 3, 4]
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Ansible project
+# GNU General Public License v3.0+ (see LICENSES/GPL-3.0-or-later.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+# SPDX-License-Identifier: GPL-3.0-or-later
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+try:
+    from unittest.mock import MagicMock
+except ImportError:
+    from mock import MagicMock
+
+from ansible_collections.kmpm.incus.plugins.module_utils.network_bundle import fetch_all
+
+
+def test_fetch_all():
+    client = MagicMock()
+    client.query_many.return_value = [
+        {'status_code': 200, 'metadata': {'name': 'web'}},
+        {'status_code': 200, 'metadata': {'listen_address': '10.0.0.1'}},
+        {'status_code': 0, 'error_code': 404, 'metadata': None},
+    ]
+    acl, forward, loadbalancer = fetch_all(client, 'net1', listen_address='10.0.0.1', acl_name='web')
+    assert acl == {'name': 'web'}
+    assert forward == {'listen_address': '10.0.0.1'}
+    assert loadbalancer is None
+    assert [q['url'] for q in client.query_many.call_args[0][0]] == [
+        '/1.0/network-acls/web',
+        '/1.0/networks/net1/forwards/10.0.0.1',
+        '/1.0/networks/net1/load-balancers/10.0.0.1',
+    ]
+
+
+def test_fetch_all_acl_only():
+    client = MagicMock()
+    client.query_many.return_value = [{'status_code': 200, 'metadata': {'name': 'web'}}]
+    assert fetch_all(client, 'net1', acl_name='web') == ({'name': 'web'}, None, None)